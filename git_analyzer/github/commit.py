@@ -1,18 +1,64 @@
 """ GitHub Commit Class File """
 
+import asyncio
+import functools
 import json
+import os
+from concurrent.futures import Executor
 from pathlib import Path
 
 import aiohttp
+import orjson
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+import zstandard
 
 from .github import GitHub
 
 
+@functools.lru_cache(maxsize=None)
+def make_dir(directory: Path) -> None:
+    """Create the directory if it doesn't exist, once per directory"""
+    directory.mkdir(parents=True, exist_ok=True)
+
+
 class Commit(GitHub):
     """Commit"""
 
-    def __init__(self, url: str, sha: str = None, auto_get: bool = True):
+    # pylint: disable=too-many-instance-attributes,too-many-public-methods
+    # The response data and its parsed table are cached per commit
+    # Most public methods are read-only properties of the commit data
+
+    data_dir = Path(__file__).parent.parent.parent.joinpath("data")
+
+    # Compression of the saved parquet files
+    parquet_compression: dict = {"compression": "zstd", "compression_level": 3}
+
+    # Columns kept from the files json data, other fields are dropped
+    files_schema = pa.schema(
+        [
+            ("sha", pa.string()),
+            ("filename", pa.string()),
+            ("status", pa.string()),
+            ("additions", pa.int32()),
+            ("deletions", pa.int32()),
+            ("changes", pa.int32()),
+            ("blob_url", pa.string()),
+            ("raw_url", pa.string()),
+            ("contents_url", pa.string()),
+            ("patch", pa.string()),
+        ]
+    )
+
+    def __init__(
+        self,
+        url: str,
+        sha: str = None,
+        auto_get: bool = False,
+        directory: Path | None = None,
+    ):
         """
         Constructor
 
@@ -20,8 +66,12 @@ class Commit(GitHub):
         ----------
         url : str
             URL of the commit
+        sha : str, optional
+            SHA of the commit, used before the commit data is retrieved
         auto_get : bool
-            Automatically get the commit data
+            Automatically get the commit data. Default is False
+        directory : Path | None
+            Directory to save the commit in. Default is data/<repository>
         """
 
         # Call the superclass constructor
@@ -30,6 +80,14 @@ class Commit(GitHub):
         self.url: str = url
         self._sha: str = sha
 
+        # Repository name from the URL: .../repos/<owner>/<repository>/commits/<sha>
+        self._repository: str = url.rsplit("/", 3)[-3]
+
+        # Directory to save the commit in
+        if directory is None:
+            directory = self.data_dir.joinpath(self.repository)
+        self.directory: Path = directory
+
         # Cache the response data from GitHub API
         self.data: json = None
 
@@ -38,7 +96,8 @@ class Commit(GitHub):
             self.get_commit(cache=True)
 
         # Cache parsed data
-        self.changes: pd.DataFrame | None = None
+        self.table: pa.Table | None = None
+        self._changes: pd.DataFrame | None = None
 
         # Cache file saved path
         self.file_path: Path | None = None
@@ -60,24 +119,33 @@ class Commit(GitHub):
             Commit data from GitHub API
         """
 
+        # Use the raw data saved by a previous run
+        data = self.read_raw()
+        if data is not None:
+            if cache and self.data is None:
+                self.data = data
+            return data
+
         # parameters
         params = {
             "per_page": 100,
         }
 
-        # Get the data
-        resp = self.get(
-            self.url,
-            headers=self.headers,
-            params=params,
-        )
+        # Get the data, write_raw() keeps it so the ETag cache is not used
+        resp = self.get(self.url, headers=self.headers, params=params)
+
+        # Parse the json data once
+        data = self.read_json(resp)
+
+        # Save the raw data for the next runs
+        self.write_raw(data)
 
         # Cache the data if not already cached
         if cache and self.data is None:
-            self.data = resp.json()
+            self.data = data
 
         # Return the data
-        return resp.json()
+        return data
 
     def parse(self) -> pd.DataFrame:
         """
@@ -91,24 +159,24 @@ class Commit(GitHub):
         Notes
         -----
             - Columns: sha, filename, status, additions, deletions, changes,
-            blob_url, raw_url, patch
+            blob_url, raw_url, contents_url, patch
+            - sha is the sha of the file blob, not of the commit
         """
 
         # Get the commit data
         if self.data is None:
             self.get_commit()
 
-        # Get the files and convert to a dataframe
-        files_df = self.__files_to_df(self.files)
-
-        # Cache the dataframe
-        self.changes = files_df
+        # Get the files and convert to a table
+        self.table = self.__files_to_table(self.files)
+        self._changes = None
 
-        return files_df
+        # Convert the table to a dataframe
+        return self.changes
 
     def save(self, overwrite: bool = False) -> Path:
         """
-        Save the changes dataframe to a parquet file
+        Save the changes table to a parquet file
 
         Parameters
         ----------
@@ -121,31 +189,22 @@ class Commit(GitHub):
             Path to the saved file
         """
 
-        # Build filename
-        file_name = self.sha + ".parquet"
-
         # Build file path
-        project_root = Path(__file__).parent.parent.parent
-        file_path = project_root.joinpath("data", self.repository, file_name)
+        file_path = self.get_file_path()
 
         # Create the folder if it doesn't exist
-        file_path.parent.mkdir(parents=True, exist_ok=True)
-
-        # Cache the file path
-        self.file_path = file_path
+        make_dir(file_path.parent)
 
         # Save if it doesn't exist or if overwrite is True
         if not file_path.exists() or overwrite:
             # Get and Parse the commit data
-            if self.changes is None:
-                self.parse()
+            if self.table is None:
+                if self.data is None:
+                    self.get_commit()
+                self.table = self.__files_to_table(self.files)
 
-            # Get the changes dataframe
-            # pylint: disable=invalid-name
-            df = self.changes
-
-            # Save the dataframe to a parquet file
-            df.to_parquet(file_path)
+            # Save the table to a parquet file
+            self.__write_table(self.table, file_path)
 
         # Return the file path
         return file_path
@@ -173,18 +232,29 @@ class Commit(GitHub):
             Commit data from GitHub API
         """
 
+        # Use the raw data saved by a previous run, read off the event loop
+        loop = asyncio.get_running_loop()
+        data = await loop.run_in_executor(None, self.read_raw)
+        if data is not None:
+            if cache and self.data is None:
+                self.data = data
+            return data
+
         # parameters
         params = {
             "per_page": 100,
         }
 
-        # Get the data
+        # Get the data, write_raw() keeps it so the ETag cache is not used
         resp = await self.get_async(
             session=session, url=self.url, headers=self.headers, params=params
         )
 
         # Get the json data
-        data = await resp.json()
+        data = await self.read_json_async(resp)
+
+        # Save the raw data for the next runs, written off the event loop
+        await loop.run_in_executor(None, self.write_raw, data)
 
         # Cache the data if not already cached
         if cache and self.data is None:
@@ -210,26 +280,29 @@ class Commit(GitHub):
         Notes
         -----
             - Columns: sha, filename, status, additions, deletions, changes,
-            blob_url, raw_url, patch
+            blob_url, raw_url, contents_url, patch
+            - sha is the sha of the file blob, not of the commit
         """
 
         # Get the commit data
         if self.data is None:
             await self.get_commit_async(session=session)
 
-        # Get the files and convert to a dataframe
-        files_df = self.__files_to_df(self.files)
+        # Get the files and convert to a table
+        self.table = self.__files_to_table(self.files)
+        self._changes = None
 
-        # Cache the dataframe
-        self.changes = files_df
-
-        return files_df
+        # Convert the table to a dataframe
+        return self.changes
 
     async def save_async(
-        self, session: aiohttp.ClientSession, overwrite: bool = False
+        self,
+        session: aiohttp.ClientSession,
+        overwrite: bool = False,
+        executor: Executor | None = None,
     ) -> Path:
         """
-        Save the changes dataframe to a parquet file
+        Save the changes table to a parquet file
 
         Parameters
         ----------
@@ -237,6 +310,8 @@ class Commit(GitHub):
             Session to use for the request
         overwrite : bool
             Overwrite the file if it already exists
+        executor : Executor | None
+            Executor to write the file in. Default is the event loop's executor
 
         Returns
         -------
@@ -244,31 +319,24 @@ class Commit(GitHub):
             Path to the saved file
         """
 
-        # Build filename
-        file_name = self.sha + ".parquet"
-
         # Build file path
-        project_root = Path(__file__).parent.parent.parent
-        file_path = project_root.joinpath("data", self.repository, file_name)
+        file_path = self.get_file_path()
 
         # Create the folder if it doesn't exist
-        file_path.parent.mkdir(parents=True, exist_ok=True)
-
-        # Cache the file path
-        self.file_path = file_path
+        make_dir(file_path.parent)
 
         # Save if it doesn't exist or if overwrite is True
         if not file_path.exists() or overwrite:
             # Get and Parse the commit data
-            if self.changes is None:
-                await self.parse_async(session=session)
-
-            # Get the changes dataframe
-            # pylint: disable=invalid-name
-            df = self.changes
+            if self.table is None:
+                if self.data is None:
+                    await self.get_commit_async(session=session)
+                self.table = self.__files_to_table(self.files)
 
-            # Save the data to a parquet file
-            df.to_parquet(file_path)
+            # Save the table to a parquet file without blocking the event loop
+            await asyncio.get_running_loop().run_in_executor(
+                executor, self.__write_table, self.table, file_path
+            )
 
         # Return the file path
         return file_path
@@ -288,40 +356,176 @@ class Commit(GitHub):
 
         Notes
         -----
-        Requires the commit data to be  retrieved and parsed.
+        Requires the commit data to be retrieved or the sha to be given.
         """
 
-        # Build filename
-        file_name = self.sha + ".parquet"
+        # Cache the file path
+        if self.file_path is None:
+            self.file_path = self.directory.joinpath(self.sha + ".parquet")
 
-        # Build file path
-        project_root = Path(__file__).parent.parent.parent
-        file_path = project_root.joinpath("data", self.repository, file_name)
+        return self.file_path
 
-        return file_path
+    def get_raw_path(self) -> Path | None:
+        """
+        Get the path of the raw commit data cache
 
-    @staticmethod
-    def __files_to_df(files: list[dict[str, str]]) -> pd.DataFrame:
+        Returns
+        -------
+        Path | None
+            Path to the zstd compressed json file. None if the sha is unknown.
+        """
+
+        if self.sha is None:
+            return None
+
+        return self.directory.joinpath(".raw", self.sha + ".json.zst")
+
+    def read_raw(self) -> json:
+        """
+        Read the raw commit data saved by write_raw()
+
+        Returns
+        -------
+        json
+            Commit data from GitHub API. None if it is not saved.
+
+        Notes
+        -----
+        The data of a commit never changes, so it is never re-validated.
+        """
+
+        raw_path = self.get_raw_path()
+        if raw_path is None or not raw_path.is_file():
+            return None
+
+        # A corrupted file (e.g. from an older interrupted run) is a cache miss
+        try:
+            return orjson.loads(
+                zstandard.ZstdDecompressor().decompress(raw_path.read_bytes())
+            )
+        except (zstandard.ZstdError, orjson.JSONDecodeError):
+            return None
+
+    def write_raw(self, data: json) -> None:
+        """
+        Save the raw commit data to a zstd compressed json file
+
+        Parameters
+        ----------
+        data : json
+            Commit data from GitHub API
+
+        Notes
+        -----
+        Error responses (no 'sha') are not saved.
+        The file is replaced atomically.
+        """
+
+        if not isinstance(data, dict) or "sha" not in data:
+            return
+
+        raw_path = self.directory.joinpath(".raw", data["sha"] + ".json.zst")
+        make_dir(raw_path.parent)
+
+        # Write to a temporary file first so an interrupted run leaves no partial file
+        tmp_path = raw_path.with_suffix(".zst.tmp")
+        tmp_path.write_bytes(
+            zstandard.ZstdCompressor(level=3).compress(orjson.dumps(data))
+        )
+        os.replace(tmp_path, raw_path)
+
+    @classmethod
+    def __files_to_table(cls, files: list[dict[str, str]]) -> pa.Table:
         """
-        Convert the files to a dataframe
+        Convert the files to an arrow table
 
         Parameters
         ----------
         files : list[dict[str, str]]
             List of files json data from GitHub API
+
+        Returns
+        -------
+        pa.Table
+            Table of modified files
+        """
+
+        # Convert the files to a table without building a dataframe
+        # Missing optional fields (e.g. patch) are null, unused fields are dropped
+        return pa.Table.from_pylist(files, schema=cls.files_schema)
+
+    @staticmethod
+    def count_patch_lines(patch: pa.Array | pa.ChunkedArray) -> pa.Table:
         """
+        Count the hunks and the added and removed lines of the patches
 
-        # Convert the files to a dataframe
-        # pylint: disable=invalid-name
-        df = pd.DataFrame(files)
+        Parameters
+        ----------
+        patch : pa.Array | pa.ChunkedArray
+            'patch' column of the changes table
+
+        Returns
+        -------
+        pa.Table
+            int32 columns: hunks, added_lines, removed_lines. 0 without a patch.
+
+        Notes
+        -----
+        Counted with arrow's regex kernels over the whole column, not per patch.
+        The patches of the GitHub API have no '---' and '+++' file headers.
+        """
+
+        # pylint: disable=no-member
+        counts = {
+            name: pc.count_substring_regex(patch, pattern=pattern)
+            .fill_null(0)
+            .cast(pa.int32())
+            for name, pattern in (
+                ("hunks", r"(?m)^@@"),
+                ("added_lines", r"(?m)^\+"),
+                ("removed_lines", r"(?m)^-"),
+            )
+        }
 
-        # Return the dataframe
-        return df
+        return pa.table(counts)
+
+    @staticmethod
+    def __write_table(table: pa.Table, file_path: Path) -> None:
+        """
+        Write the table to a zstd compressed parquet file
+
+        Parameters
+        ----------
+        table : pa.Table
+            Table of modified files
+        file_path : Path
+            Path to the parquet file
+        """
+
+        # Dictionary encode the repetitive columns
+        dictionary_columns = [
+            column for column in ("filename", "status") if column in table.column_names
+        ]
+
+        pq.write_table(
+            table,
+            file_path,
+            use_dictionary=dictionary_columns,
+            data_page_size=1 << 20,
+            **Commit.parquet_compression,
+        )
 
     # endregion Helper Methods
 
     # region Properties
 
+    @property
+    def changes(self) -> pd.DataFrame | None:
+        """Dataframe of modified files, converted from the table when first used"""
+        if self._changes is None and self.table is not None:
+            self._changes = self.table.to_pandas()
+        return self._changes
+
     @property
     def sha(self) -> str:
         """Get the sha of the commit"""
@@ -365,6 +569,6 @@ class Commit(GitHub):
     @property
     def repository(self) -> str:
         """Repository Name"""
-        return self.url.split("/")[-3]
+        return self._repository
 
     # endregion Properties
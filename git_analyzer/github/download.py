@@ -1,27 +1,90 @@
 """ Bulk Download Commit Data """
 
 import asyncio
+import functools
+import itertools
 import math
+import os
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from typing import Iterable, Iterator
 
 import aiohttp
+import httpx
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+from pyarrow import csv
 
-from .commit import Commit
+from .commit import Commit, make_dir
 from .repository import Repository, RepositoryNotFoundError
 
 
+def sha_to_u64(shas: Iterable[str]) -> np.ndarray:
+    """
+    Convert hex SHAs to integers of their first 8 bytes
+
+    Parameters
+    ----------
+    shas : Iterable[str]
+        40 character hex SHAs
+
+    Returns
+    -------
+    np.ndarray
+        uint64 key of each SHA
+    """
+
+    # Decode all the prefixes at once instead of int(sha[:16], 16) per SHA
+    prefixes = bytes.fromhex("".join(sha[:16] for sha in shas))
+
+    return np.frombuffer(prefixes, dtype=">u8").astype(np.uint64)
+
+
 class Download:
-    """Download Commit Data"""
+    """
+    Download Commit Data
+
+    Notes
+    -----
+    The class attributes are the defaults of the download tuning options.
+    Pass http2 or concurrency to the constructor to change them for one download.
+    """
+
+    # pylint: disable=too-many-instance-attributes
+    # The listing, the index cache and the shared session are all per download
 
     data_dir = Path(__file__).parent.parent.parent.joinpath("data")
     encoding_csv = "utf-8-sig"
 
+    # Default max number of commits downloaded at the same time
+    concurrency: int = 16
+
+    # Default to an aiohttp shared session instead of an HTTP/2 httpx client
+    http2: bool = False
+
+    # Threads writing the parquet files (pyarrow releases the GIL)
+    max_write_workers = 4
+
+    # Schema of the combined commits file: one row per modified file
+    combined_schema = pa.schema(
+        [pa.field("commit_sha", pa.string()), *Commit.files_schema]
+    )
+
+    # Rows per row group of the combined commits file
+    combined_row_group_size = 50_000
+
     def __init__(
         self,
         owner: str,
         name: str,
         number_of_commits: int = 1000,
+        http2: bool | None = None,
+        concurrency: int | None = None,
+        check_exists: bool = True,
     ):
         """
         Constructor
@@ -32,28 +95,75 @@ class Download:
             GitHub repository owner
         name : str
             GitHub repository repo
+        number_of_commits : int
+            Number of the latest commits to download. Default is 1000
+        http2 : bool | None
+            Use an HTTP/2 httpx client as the shared session instead of aiohttp.
+            Default is Download.http2
+        concurrency : int | None
+            Max number of commits downloaded at the same time.
+            Default is Download.concurrency
+        check_exists : bool
+            Check that the repository exists. Disable if it was already checked
         """
 
+        # pylint: disable=too-many-arguments
+        # The tuning options are optional keywords with the class defaults
+
         self.owner = owner
         self.repo = name
         self.num_commits = number_of_commits
         self.num_pages = math.ceil(number_of_commits / 100)
+        self.http2 = self.http2 if http2 is None else http2
+        self.concurrency = self.concurrency if concurrency is None else concurrency
 
         # Initialize the repository
         self.repository = Repository(owner=owner, name=name)
 
         # Make sure the repository is valid
-        if not self.repository.exists:
+        if check_exists and not self.repository.exists:
             raise RepositoryNotFoundError(self.repository.url)
 
         # Download directory
         self.directory = self.data_dir.joinpath(self.repo)
-        # Make sure the directory exists
-        self.directory.mkdir(parents=True, exist_ok=True)
+        # Make sure the directory exists, commits saved in it skip the mkdir
+        make_dir(self.directory)
+
+        # Combined commits file, next to the download directory
+        self.combined_path = self.data_dir.joinpath(self.repo + ".parquet")
 
         # Cache commits_df: list of the latest commits
         self.commits_df: pd.DataFrame | None = None
 
+        # Cache the index, with the (mtime, size) of the index file it was read at
+        self.index_cache: tuple[tuple[int, int], pd.DataFrame] | None = None
+
+        # Session shared across all downloads, opened with 'async with'
+        self.session: aiohttp.ClientSession | httpx.AsyncClient | None = None
+
+    async def __aenter__(self) -> "Download":
+        """Open the shared session"""
+
+        if self.http2:
+            self.session = self.repository.create_http2_client()
+        else:
+            # One connection per concurrent download
+            self.session = self.repository.create_session(
+                limit_per_host=self.concurrency
+            )
+
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        """Close the shared session"""
+
+        if isinstance(self.session, httpx.AsyncClient):
+            await self.session.aclose()
+        else:
+            await self.session.close()
+
+        self.session = None
+
     def get_commits_df(self) -> pd.DataFrame:
         """
         Get the latest commits from the repository
@@ -84,7 +194,8 @@ class Download:
         Parameters
         ----------
         session : aiohttp.ClientSession | None
-            Aiohttp session object. If None, a new session will be created.
+            Aiohttp session object. If None, the shared session is used
+            or a new session will be created.
 
         Returns
         -------
@@ -92,6 +203,10 @@ class Download:
             Dataframe of the latest commits
         """
 
+        # Use the shared session if none is given
+        if session is None:
+            session = self.session
+
         # Get the commits
         commits = await self.repository.get_commits_async(
             session=session, max_pages=self.num_pages
@@ -122,20 +237,27 @@ class Download:
         if self.commits_df is None:
             self.commits_df = self.get_commits_df()
 
-        # Get the repository url
-        url = self.repository.url
-
         # Store saved file paths
         saved_files = []
 
-        # Iterate through commits_df
-        for index, commit in self.commits_df.iterrows():
-            # Build the commit url
-            commit_url = url + "/commits/" + commit["sha"]
+        # List the saved commits once instead of checking each file
+        saved_shas = set() if overwrite else self.get_saved_shas()
+
+        # Iterate through the commit shas and urls
+        for index, (sha, commit_url) in enumerate(self.__commit_urls()):
+            # Skip the commit without any request if it is already saved
+            if sha in saved_shas:
+                saved_files.append(self.directory.joinpath(f"{sha}.parquet"))
+                continue
 
             try:
                 # Create a commit object and download the commit
-                commit = Commit(url=commit_url, sha=commit["sha"], auto_get=False)
+                commit = Commit(
+                    url=commit_url,
+                    sha=sha,
+                    auto_get=False,
+                    directory=self.directory,
+                )
 
                 # Save the commit
                 filepath = commit.save(overwrite=overwrite)
@@ -152,7 +274,10 @@ class Download:
         return index_path
 
     async def download_commits_async(
-        self, session: aiohttp.ClientSession, overwrite: bool = False
+        self,
+        session: aiohttp.ClientSession | None = None,
+        overwrite: bool = False,
+        concurrency: int | None = None,
     ) -> Path:
         """
         Download the commits asynchronously to the data folder.
@@ -160,9 +285,13 @@ class Download:
         Parameters
         ----------
         session : aiohttp.ClientSession | None
-            Aiohttp session object to use.
+            Aiohttp session object to use. If None, the shared session is used
+            or a new one is opened for this download.
         overwrite : bool
             Overwrite the existing files. Default is False
+        concurrency : int | None
+            Max number of commits downloaded at the same time.
+            Default is the downloader's concurrency
 
         Returns
         -------
@@ -170,39 +299,339 @@ class Download:
             Path to the index file of all (old and new) saved commits in the data folder
         """
 
+        # Use the downloader's settings if none are given
+        if session is None:
+            session = self.session
+        if concurrency is None:
+            concurrency = self.concurrency
+
+        # Open the shared session for this download only
+        if session is None:
+            async with self:
+                return await self.download_commits_async(
+                    overwrite=overwrite, concurrency=concurrency
+                )
+
         # Check if the commits_df is already cached
         if self.commits_df is None:
             self.commits_df = await self.get_commits_df_async(session=session)
 
-        # Get the repository url
-        url = self.repository.url
+        # Skip the commits without any request if they are already saved
+        saved_shas = set() if overwrite else self.get_saved_shas()
+        commit_urls = {
+            index: (sha, commit_url)
+            for index, (sha, commit_url) in enumerate(self.__commit_urls())
+            if sha not in saved_shas
+        }
+
+        # Download the commits, the failed ones do not stop the others
+        errors = await self.__save_commits_async(
+            session, commit_urls, overwrite, concurrency
+        )
 
-        # Store saved file paths
-        saved_files = []
+        # Report the failed commits
+        for index, error in errors.items():
+            commit_url = commit_urls[index][1]
+            # Empty commit
+            if isinstance(error, KeyError):
+                print(f"{index}\t - Error downloading commit {commit_url}")
+            else:
+                print(f"{index}\t - Error downloading commit {commit_url}: {error!r}")
+
+        # Update the index file
+        index_path = self.save_index(self.commits_df)
+
+        return index_path
+
+    async def __save_commits_async(
+        self,
+        session: aiohttp.ClientSession | httpx.AsyncClient,
+        commit_urls: dict[int, tuple[str, str]],
+        overwrite: bool,
+        concurrency: int,
+    ) -> dict[int, BaseException]:
+        """
+        Get and save the commits concurrently
+
+        Parameters
+        ----------
+        session : aiohttp.ClientSession | httpx.AsyncClient
+            Session to use for the requests
+        commit_urls : dict[int, tuple[str, str]]
+            (sha, url) of the commits to download, by their index in commits_df
+        overwrite : bool
+            Overwrite the existing files
+        concurrency : int
+            Max number of requests at the same time
+
+        Returns
+        -------
+        dict[int, BaseException]
+            Error of each commit that could not be saved, by its index
+        """
+
+        loop = asyncio.get_running_loop()
+
+        # Limit the number of concurrent requests to respect GitHub rate limits
+        fetch_semaphore = asyncio.Semaphore(concurrency)
+
+        # Bound the number of commits in memory, fetching or waiting to be written
+        pending_semaphore = asyncio.Semaphore(concurrency + 2 * self.max_write_workers)
+
+        async def save_commit(executor: ThreadPoolExecutor, sha: str, url: str) -> Path:
+            """Get a commit, then parse and save it in a thread"""
+
+            commit = Commit(url=url, sha=sha, auto_get=False, directory=self.directory)
+
+            async with pending_semaphore:
+                # Free the request slot once fetched, so the next commits are
+                # fetched while this one waits for a write thread
+                async with fetch_semaphore:
+                    await commit.get_commit_async(session=session)
 
-        # Iterate through commits_df
-        for index, commit in self.commits_df.iterrows():
-            # Build the commit url
-            commit_url = url + "/commits/" + commit["sha"]
+                # pyarrow releases the GIL while writing
+                return await loop.run_in_executor(
+                    executor, functools.partial(commit.save, overwrite=overwrite)
+                )
+
+        # Threads shared by all the file writes of this download
+        with ThreadPoolExecutor(max_workers=self.max_write_workers) as executor:
+            tasks = {
+                index: asyncio.create_task(save_commit(executor, sha, commit_url))
+                for index, (sha, commit_url) in commit_urls.items()
+            }
 
             try:
-                # Create a commit object and download the commit
-                commit = Commit(url=commit_url, sha=commit["sha"], auto_get=False)
+                results = await asyncio.gather(*tasks.values(), return_exceptions=True)
+            finally:
+                # Stop the remaining requests if the download is cancelled
+                for task in tasks.values():
+                    task.cancel()
+
+        return {
+            index: result
+            for index, result in zip(tasks, results)
+            if isinstance(result, BaseException)
+        }
+
+    async def download_commits_combined_async(
+        self,
+        session: aiohttp.ClientSession | None = None,
+        overwrite: bool = False,
+        concurrency: int | None = None,
+    ) -> Path:
+        """
+        Download the commits asynchronously to a single parquet file.
 
-                # Save the commit
-                filepath = await commit.save_async(session=session, overwrite=overwrite)
-                await asyncio.sleep(0)
+        Parameters
+        ----------
+        session : aiohttp.ClientSession | None
+            Aiohttp session object to use. If None, the shared session is used
+            or a new one is opened for this download.
+        overwrite : bool
+            Overwrite the existing file instead of adding to it. Default is False
+        concurrency : int | None
+            Max number of commits downloaded at the same time.
+            Default is the downloader's concurrency
 
-                # Add the filepath to the list
-                saved_files.append(filepath)
+        Returns
+        -------
+        Path
+            Path to the combined commits file
+
+        Notes
+        -----
+        All the commits are written to 'combined_path' with a 'commit_sha'
+        column, sorted by it, instead of one parquet file per commit.
+        Read a commit with pq.read_table(path, filters=[("commit_sha", "=", sha)]).
+        The commits already in the file are kept and not downloaded again.
+        """
+
+        # Use the downloader's settings if none are given
+        if session is None:
+            session = self.session
+        if concurrency is None:
+            concurrency = self.concurrency
+
+        # Open the shared session for this download only
+        if session is None:
+            async with self:
+                return await self.download_commits_combined_async(
+                    overwrite=overwrite, concurrency=concurrency
+                )
+
+        # Check if the commits_df is already cached
+        if self.commits_df is None:
+            self.commits_df = await self.get_commits_df_async(session=session)
+
+        # Get the commits already in the combined file
+        saved = None
+        if self.combined_path.exists() and not overwrite:
+            saved = pq.read_table(
+                self.combined_path, columns=self.combined_schema.names
+            ).cast(self.combined_schema)
+        saved_shas = set()
+        if saved is not None:
+            saved_shas = set(saved["commit_sha"].to_pylist())
+
+        # Create the commit objects of the commits that are not saved yet
+        commits = [
+            Commit(url=commit_url, sha=sha, auto_get=False)
+            for sha, commit_url in self.__commit_urls()
+            if sha not in saved_shas
+        ]
+
+        # Get the commits data concurrently, the failed ones do not stop the others
+        errors = await self.__fetch_commits_async(session, commits, concurrency)
+
+        # Report the failed commits and write the fetched ones only
+        for index, error in errors.items():
+            commit_url = commits[index].url
+            print(f"{index}\t - Error downloading commit {commit_url}: {error!r}")
+        commits = [
+            commit for index, commit in enumerate(commits) if index not in errors
+        ]
+
+        # Write the saved and new commits to a temporary file, then replace the file
+        tmp_path = self.combined_path.with_suffix(".parquet.tmp")
+        await asyncio.get_running_loop().run_in_executor(
+            None, self.__write_combined, tmp_path, saved, commits
+        )
+        os.replace(tmp_path, self.combined_path)
+
+        return self.combined_path
+
+    def __commit_urls(self) -> Iterator[tuple[str, str]]:
+        """
+        Get the sha and API url of the commits in commits_df
+
+        Returns
+        -------
+        Iterator[tuple[str, str]]
+            Pairs of (sha, url), with the urls built in one vectorized operation
+        """
+
+        # Join on the arrow strings, pandas cannot add str to string[pyarrow]
+        # pylint: disable=no-member
+        shas = pa.array(self.commits_df["sha"], pa.string())
+        urls = pc.binary_join_element_wise(
+            self.repository.url + "/commits/", shas, ""
+        )
+
+        return zip(shas.to_pylist(), urls.to_pylist())
+
+    @staticmethod
+    async def __fetch_commits_async(
+        session: aiohttp.ClientSession,
+        commits: list[Commit],
+        concurrency: int,
+    ) -> dict[int, BaseException]:
+        """
+        Get the data of the commits concurrently
+
+        Parameters
+        ----------
+        session : aiohttp.ClientSession
+            Aiohttp session object to use.
+        commits : list[Commit]
+            Commits to get the data of
+        concurrency : int
+            Max number of requests at the same time
+
+        Returns
+        -------
+        dict[int, BaseException]
+            Error of each commit that could not be fetched, by its index in commits
+        """
+
+        # Limit the number of concurrent requests to respect GitHub rate limits
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def fetch_commit(commit: Commit) -> None:
+            """Get the data of a single commit"""
+
+            async with semaphore:
+                await commit.get_commit_async(session=session)
+
+        tasks = [asyncio.create_task(fetch_commit(commit)) for commit in commits]
+
+        try:
+            results = await asyncio.gather(*tasks, return_exceptions=True)
+        finally:
+            # Stop the remaining requests if the download is cancelled
+            for task in tasks:
+                task.cancel()
+
+        return {
+            index: result
+            for index, result in enumerate(results)
+            if isinstance(result, BaseException)
+        }
+
+    def __write_combined(
+        self, file_path: Path, saved: pa.Table | None, commits: list[Commit]
+    ) -> None:
+        """
+        Write the commits to a combined parquet file in large row groups
+
+        Parameters
+        ----------
+        file_path : Path
+            Path to the combined file
+        saved : pa.Table | None
+            Commits already saved in the combined file
+        commits : list[Commit]
+            Commits with their data
+        """
+
+        # Keep the commits already saved
+        tables = [saved] if saved is not None else []
+
+        for index, commit in enumerate(commits):
             # Empty commit
-            except KeyError:
-                print(f"{index}\t - Error downloading commit {commit_url}")
+            if "files" not in commit.data:
+                print(f"{index}\t - Error downloading commit {commit.url}")
+                continue
+
+            tables.append(
+                pa.Table.from_pylist(
+                    [{"commit_sha": commit.sha, **file} for file in commit.files],
+                    schema=self.combined_schema,
+                )
+            )
 
-        # Update the index file
-        index_path = self.save_index(self.commits_df)
+        # Sort by commit so row group statistics can skip to a commit's files
+        table = pa.concat_tables(tables or [self.combined_schema.empty_table()])
+        table = table.sort_by("commit_sha")
 
-        return index_path
+        pq.write_table(
+            table,
+            file_path,
+            use_dictionary=True,
+            row_group_size=self.combined_row_group_size,
+            **Commit.parquet_compression,
+        )
+
+    def get_saved_shas(self) -> set[str]:
+        """
+        Get the shas of the commits saved in the data folder.
+
+        Returns
+        -------
+        set[str]
+            SHAs of the saved commits
+
+        Notes
+        -----
+        Lists the directory once instead of checking each commit file.
+        """
+
+        with os.scandir(self.directory) as entries:
+            return {
+                entry.name[: -len(".parquet")]
+                for entry in entries
+                if entry.name.endswith(".parquet") and entry.is_file()
+            }
 
     def save_index(self, commits: pd.DataFrame) -> Path:
         """
@@ -225,11 +654,17 @@ class Download:
 
         # Check if the index file exists
         if index_path.is_file():
-            # Read the index file
-            index_df = self.get_index()
+            # Read only the sha column of the index file
+            index_shas = set(
+                csv.read_csv(
+                    index_path,
+                    read_options=csv.ReadOptions(encoding=self.encoding_csv),
+                    convert_options=csv.ConvertOptions(include_columns=["sha"]),
+                )["sha"].to_pylist()
+            )
 
             # Remove commits that are already in the index based on sha
-            commits = commits.loc[~commits["sha"].isin(index_df["sha"])]
+            commits = commits.loc[~commits["sha"].isin(index_shas)]
 
             # Append the new commits to the index file
             commits.to_csv(
@@ -252,14 +687,24 @@ class Download:
 
         return index_path
 
-    def get_index(self) -> pd.DataFrame:
+    def get_index(self, sort_by: str | None = None) -> pd.DataFrame:
         """
         Get the index of the commits from the data folder.
 
+        Parameters
+        ----------
+        sort_by : str, optional
+            Column to sort the index by in ascending order
+
         Returns
         -------
         pd.DataFrame
             Dataframe of the commits
+
+        Notes
+        -----
+        The index is only read again when index.csv changes.
+        Sorting is done on the arrow array of the sort column.
         """
 
         # Get the index file path
@@ -267,18 +712,239 @@ class Download:
 
         # Check if the index file exists
         if index_path.exists():
-            # Read the index file
-            index_df = pd.read_csv(
-                index_path,
-                encoding=self.encoding_csv,
-                header=0,
-            )
-
-            # Set index column name to 'index'
-            index_df.index.name = "index"
+            # Only read the index again if the file changed since it was cached
+            stat = index_path.stat()
+            version = (stat.st_mtime_ns, stat.st_size)
+            if self.index_cache is None or self.index_cache[0] != version:
+                # Read the index file
+                index_df = pd.read_csv(
+                    index_path,
+                    encoding=self.encoding_csv,
+                    header=0,
+                )
+
+                # Set index column name to 'index'
+                index_df.index.name = "index"
+
+                # Cache the index
+                self.index_cache = (version, index_df)
+
+            index_df = self.index_cache[1]
+
+            # Sort by the column with arrow, keeping the original row labels
+            if sort_by is not None:
+                # pylint: disable=no-member
+                order = pc.sort_indices(pa.array(index_df[sort_by]))
+                return index_df.take(order.to_numpy())
 
             # Return the index
-            return index_df
+            return index_df.copy(deep=False)
 
         # Return an empty dataframe
         return pd.DataFrame()
+
+    def read_commits(self, shas: list[str] | None = None) -> pd.DataFrame:
+        """
+        Read the saved commits from the data folder into one dataframe.
+
+        Parameters
+        ----------
+        shas : list[str] | None
+            SHAs of the commits to read. Default is all the saved commits
+
+        Returns
+        -------
+        pd.DataFrame
+            Dataframe of the modified files, with a 'commit_sha' column
+        """
+
+        return self.read_commits_table(shas).to_pandas()
+
+    def read_commits_table(self, shas: list[str] | None = None) -> pa.Table:
+        """
+        Read the saved commits from the data folder into one arrow table.
+
+        Parameters
+        ----------
+        shas : list[str] | None
+            SHAs of the commits to read. Default is all the saved commits
+
+        Returns
+        -------
+        pa.Table
+            Table of the modified files, with the combined_schema columns
+
+        Notes
+        -----
+        The files are read by pyarrow.dataset in parallel threads.
+        """
+
+        # Get the file paths of the commits
+        if shas is None:
+            file_paths = sorted(self.directory.glob("*.parquet"))
+        else:
+            file_paths = [self.directory.joinpath(f"{sha}.parquet") for sha in shas]
+
+        if not file_paths:
+            return self.combined_schema.empty_table()
+
+        # Missing columns (e.g. no patch in a commit) are read as nulls
+        dataset = ds.dataset(
+            [str(file_path) for file_path in file_paths],
+            schema=Commit.files_schema,
+            format="parquet",
+        )
+
+        try:
+            # Keep the fragment of each batch to know its commit
+            batches, commit_shas = [], []
+            for tagged in dataset.scanner(use_threads=True).scan_batches():
+                num_rows = tagged.record_batch.num_rows
+                batches.append(tagged.record_batch)
+                commit_shas.append([Path(tagged.fragment.path).stem] * num_rows)
+
+        # Files saved with other column types (e.g. int64 counts) are cast one by one
+        except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError):
+            return self.__read_commits_table_per_file(file_paths)
+
+        # Add the commit sha, from the file names
+        table = pa.Table.from_batches(batches, schema=Commit.files_schema)
+        commit_sha_field = self.combined_schema.field("commit_sha")
+
+        return table.add_column(
+            0,
+            commit_sha_field,
+            pa.chunked_array(commit_shas, commit_sha_field.type),
+        )
+
+    def __read_commits_table_per_file(self, file_paths: list[Path]) -> pa.Table:
+        """
+        Read the commits files one by one, casting them to the combined schema.
+
+        Parameters
+        ----------
+        file_paths : list[Path]
+            Paths to the commits files
+
+        Returns
+        -------
+        pa.Table
+            Table of the modified files, with the combined_schema columns
+        """
+
+        # Read the commits files
+        tables = [self.combined_schema.empty_table()]
+        for file_path in file_paths:
+            table = pq.read_table(file_path, memory_map=True)
+
+            # Build the columns of the combined schema, older files may differ
+            columns = []
+            for field in self.combined_schema:
+                # Add the commit sha, from the file name
+                if field.name == "commit_sha":
+                    commit_sha = [file_path.stem] * table.num_rows
+                    columns.append(pa.array(commit_sha, field.type))
+                # Missing column (e.g. no patch in a commit)
+                elif field.name not in table.column_names:
+                    columns.append(pa.nulls(table.num_rows, field.type))
+                else:
+                    columns.append(table[field.name].cast(field.type))
+
+            tables.append(pa.Table.from_arrays(columns, schema=self.combined_schema))
+
+        return pa.concat_tables(tables)
+
+    def get_stats(self, shas: list[str] | None = None) -> pd.DataFrame:
+        """
+        Get the statistics of the saved commits.
+
+        Parameters
+        ----------
+        shas : list[str] | None
+            SHAs of the commits. Default is all the saved commits
+
+        Returns
+        -------
+        pd.DataFrame
+            Number of files, additions, deletions, changes and hunks per commit
+
+        Notes
+        -----
+        Aggregated with arrow's multithreaded hash aggregation.
+        """
+
+        # Add the number of hunks of each file
+        table = self.read_commits_table(shas)
+        table = table.append_column(
+            "hunks", Commit.count_patch_lines(table["patch"])["hunks"]
+        )
+
+        # pylint: disable=invalid-name
+        df = (
+            table.group_by("commit_sha")
+            .aggregate(
+                [
+                    ("filename", "count"),
+                    ("additions", "sum"),
+                    ("deletions", "sum"),
+                    ("changes", "sum"),
+                    ("hunks", "sum"),
+                ]
+            )
+            .to_pandas()
+        )
+
+        # Rename the aggregated columns, e.g. 'additions_sum' to 'additions'
+        df = df.rename(
+            columns={
+                "filename_count": "files",
+                "additions_sum": "additions",
+                "deletions_sum": "deletions",
+                "changes_sum": "changes",
+                "hunks_sum": "hunks",
+            }
+        ).set_index("commit_sha")
+
+        return df[["files", "additions", "deletions", "changes", "hunks"]]
+
+    def get_parent_edges(self) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Get the parent edges of the commits in the index.
+
+        Returns
+        -------
+        tuple[np.ndarray, np.ndarray]
+            int32 row positions in get_index() of the child and of the parent
+            of each edge
+
+        Notes
+        -----
+        Parents that are not in the index (older commits) are dropped.
+        SHAs are matched on their uint64 prefix with a binary search.
+        """
+
+        index_df = self.get_index()
+        if index_df.empty:
+            return np.empty(0, dtype=np.int32), np.empty(0, dtype=np.int32)
+
+        # Sorted keys of the commits to search the parents in
+        keys = sha_to_u64(index_df["sha"])
+        order = np.argsort(keys)
+        sorted_keys = keys[order]
+
+        # Parent SHAs of each commit, the parents are saved as text in the index
+        parents = index_df["parents"].astype(str).str.findall(
+            r"'sha': '([0-9a-f]{40})'"
+        )
+
+        # One edge per parent
+        child_idx = np.repeat(
+            np.arange(len(index_df), dtype=np.int32), parents.str.len().to_numpy()
+        )
+        parent_keys = sha_to_u64(itertools.chain.from_iterable(parents))
+
+        # Find the parents in the index
+        pos = np.searchsorted(sorted_keys, parent_keys).clip(max=len(keys) - 1)
+        found = sorted_keys[pos] == parent_keys
+
+        return child_idx[found], order[pos[found]].astype(np.int32)
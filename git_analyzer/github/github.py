@@ -1,15 +1,31 @@
 """ GitHub Base Class File """
 
 import asyncio
+import hashlib
+import json
 import os
 import sys
+import threading
+import time
+from pathlib import Path
+from urllib.parse import urlencode
 
 import aiohttp
+import httpx
+import orjson
 import requests
+import zstandard
+from requests.adapters import HTTPAdapter
 
 
 # Set asyncio event loop policy to WindowsSelectorEventLoopPolicy
-if sys.platform == "win32":
+# unless the user already set a policy of another type (e.g. uvloop).
+# DefaultEventLoopPolicy is the Proactor policy on Windows, so compare the
+# exact type: subclasses of it are kept.
+if (
+    sys.platform == "win32"
+    and asyncio.get_event_loop_policy().__class__ is asyncio.DefaultEventLoopPolicy
+):
     asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
 # Avoids "RuntimeError: Event loop is already running"
 
@@ -20,18 +36,53 @@ class GitHub:
     # Get gh_token from environment
     token = os.environ.get("GH_TOKEN")
 
+    # aiohttp connection pool settings
+    connection_limit: int = 100
+    connection_limit_per_host: int = 20
+    dns_cache_ttl: int = 300
+    keepalive_timeout: int = 75
+
+    # httpx HTTP/2 connection pool settings
+    http2_max_connections: int = 50
+
+    # Throttle async requests below this number of remaining requests
+    ratelimit_threshold: int = 10
+
+    # Ratelimit info is only updated every n responses while many requests remain
+    ratelimit_update_interval: int = 100
+    ratelimit_low: int = 200
+
+    # Ratelimit info shared by all instances, updated from the responses
+    shared_ratelimit_limit: int = -1
+    shared_ratelimit_remaining: int = -1
+    shared_ratelimit_reset: float = 0.0
+
+    # Responses of get_json() kept with their ETag for conditional requests
+    # Set GIT_ANALYZER_CACHE, or cache_dir, to use another directory
+    cache_dir: Path = Path(
+        os.environ.get("GIT_ANALYZER_CACHE")
+        or Path.home().joinpath(".cache", "git_analyzer")
+    )
+
+    # Max number of cached responses, the least recently written are removed
+    cache_max_files: int = 1000
+
     def __init__(self):
         """Constructor"""
 
         # Generate the headers for requests
         self.headers: dict = self.build_headers()
 
-        # GitHub API Ratelimit info
-        self.ratelimit_limit: int = -1
-        self.ratelimit_remaining: int = -1
+        # Session to reuse connections across get() calls, created on first use
+        self._requests_session: requests.Session | None = None
+
+        # HTTP/2 client for get_async() without a session, created on first use
+        self._http2_client: httpx.AsyncClient | None = None
 
         # Cache last response
-        self.response: requests.Response | aiohttp.ClientResponse | None = None
+        self.response: (
+            requests.Response | aiohttp.ClientResponse | httpx.Response | None
+        ) = None
 
     def build_headers(self) -> dict:
         """Build the headers for requests"""
@@ -53,6 +104,119 @@ class GitHub:
 
         return headers
 
+    def create_session(
+        self, limit_per_host: int | None = None
+    ) -> aiohttp.ClientSession:
+        """
+        Create an aiohttp session with a pooled keep-alive connector
+
+        Parameters
+        ----------
+        limit_per_host : int | None
+            Max connections per host. Default is connection_limit_per_host
+
+        Returns
+        -------
+        aiohttp.ClientSession
+            Session to share across requests. Must be closed by the caller.
+        """
+
+        if limit_per_host is None:
+            limit_per_host = self.connection_limit_per_host
+
+        # Reuse connections and cache DNS lookups across requests
+        connector = aiohttp.TCPConnector(
+            limit=self.connection_limit,
+            limit_per_host=limit_per_host,
+            ttl_dns_cache=self.dns_cache_ttl,
+            keepalive_timeout=self.keepalive_timeout,
+        )
+
+        return aiohttp.ClientSession(
+            connector=connector,
+            headers=self.headers,
+            json_serialize=self.dumps_json,
+        )
+
+    @property
+    def requests_session(self) -> requests.Session:
+        """
+        Session used by get(), created on first use
+
+        Returns
+        -------
+        requests.Session
+            Session keeping connections alive, safe to share across threads for GETs
+
+        Notes
+        -----
+        Instances only used asynchronously (e.g. the commits of a download)
+        never build a session and its connection pool.
+        """
+
+        if self._requests_session is None:
+            self._requests_session = requests.Session()
+
+            # Pool as many connections as concurrent requests per host
+            adapter = HTTPAdapter(pool_maxsize=self.connection_limit_per_host)
+            self._requests_session.mount("https://", adapter)
+
+        return self._requests_session
+
+    def create_http2_client(self) -> httpx.AsyncClient:
+        """
+        Create an httpx client that multiplexes requests over HTTP/2
+
+        Returns
+        -------
+        httpx.AsyncClient
+            Client to use as the session of get_async(). Must be closed by the caller.
+
+        Notes
+        -----
+        Concurrent requests share a few TLS connections instead of one per request.
+        """
+
+        limits = httpx.Limits(
+            max_connections=self.http2_max_connections,
+            max_keepalive_connections=self.http2_max_connections,
+        )
+
+        return httpx.AsyncClient(http2=True, headers=self.headers, limits=limits)
+
+    @property
+    def http2_client(self) -> httpx.AsyncClient | None:
+        """
+        HTTP/2 client used by get_async() when no session is given
+
+        Returns
+        -------
+        httpx.AsyncClient | None
+            Client opened by 'async with' the instance, None outside of it
+        """
+
+        return self._http2_client
+
+    async def close_async(self) -> None:
+        """Close the HTTP/2 client if it was opened"""
+
+        if self._http2_client is not None:
+            await self._http2_client.aclose()
+            self._http2_client = None
+
+    async def __aenter__(self) -> "GitHub":
+        """Open the HTTP/2 client shared by the requests without a session"""
+
+        if self._http2_client is None:
+            self._http2_client = self.create_http2_client()
+
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        """Close the HTTP/2 client"""
+
+        await self.close_async()
+
     def get(
         self,
         url: str,
@@ -83,16 +247,13 @@ class GitHub:
 
         # Get the data
         if params is None:
-            resp = requests.get(url, headers=headers)
+            resp = self.requests_session.get(url, headers=headers)
         # Add params if available
         else:
-            resp = requests.get(url, headers=headers, params=params)
+            resp = self.requests_session.get(url, headers=headers, params=params)
 
         # Get the ratelimit info from the headers
-        if "x-ratelimit-limit" in resp.headers:
-            self.ratelimit_limit = int(resp.headers["x-ratelimit-limit"])
-        if "x-ratelimit-remaining" in resp.headers:
-            self.ratelimit_remaining = int(resp.headers["x-ratelimit-remaining"])
+        self.update_ratelimit(resp.headers)
 
         # Cache the response
         self.response = resp
@@ -102,18 +263,18 @@ class GitHub:
 
     async def get_async(
         self,
-        session: aiohttp.ClientSession,
+        session: aiohttp.ClientSession | httpx.AsyncClient | None,
         url: str,
         headers: dict = None,
         params: dict = None,
-    ) -> aiohttp.ClientResponse:
+    ) -> aiohttp.ClientResponse | httpx.Response:
         """
         Async get() method to retrieve data from the URL
 
         Parameters
         ----------
-        session : aiohttp.ClientSession
-            Session to use for the request
+        session : aiohttp.ClientSession | httpx.AsyncClient | None
+            Session to use for the request. None uses the HTTP/2 client.
         url : str
             Endpoint URL
         headers : dict, optional
@@ -123,7 +284,7 @@ class GitHub:
 
         Returns
         -------
-        aiohttp.ClientResponse
+        aiohttp.ClientResponse | httpx.Response
             Response from the request
         """
 
@@ -131,6 +292,14 @@ class GitHub:
         if headers is None:
             headers = self.headers
 
+        # Multiplex over the HTTP/2 client opened by 'async with' the instance,
+        # or use a client for this request only
+        if session is None:
+            if self._http2_client is None:
+                async with self.create_http2_client() as client:
+                    return await self.get_async(client, url, headers, params)
+            session = self._http2_client
+
         # Get the data
         if params is None:
             resp = await session.get(url, headers=headers)
@@ -143,12 +312,363 @@ class GitHub:
             )
 
         # Get the ratelimit info from the headers
-        if "x-ratelimit-limit" in resp.headers:
-            self.ratelimit_limit = int(resp.headers["x-ratelimit-limit"])
-        if "x-ratelimit-remaining" in resp.headers:
-            self.ratelimit_remaining = int(resp.headers["x-ratelimit-remaining"])
+        self.update_ratelimit(resp.headers)
 
         # Cache the response
         self.response = resp
 
+        # Slow down when the ratelimit is almost used up
+        await self.throttle_async()
+
         return resp
+
+    def get_json(
+        self,
+        url: str,
+        headers: dict = None,
+        params: dict = None,
+    ) -> json:
+        """
+        Get the json data from the URL, revalidating the cached response
+
+        Parameters
+        ----------
+        url : str
+            Endpoint URL
+        headers : dict, optional
+            Headers to send with the request. Default is self.headers.
+        params : dict, optional
+            Parameters to send with the request
+
+        Returns
+        -------
+        json
+            Response data, parsed with orjson
+
+        Notes
+        -----
+        GitHub does not count 304 Not Modified responses against the ratelimit.
+        Use get() for responses that are already kept elsewhere.
+        """
+
+        # Send the ETag of the cached response
+        cache_path = self.get_cache_path(url, params)
+        cached = self.read_cache(cache_path)
+        headers = self.__conditional_headers(headers, cached)
+
+        resp = self.get(url, headers=headers, params=params)
+
+        # Not modified: use the cached body
+        if cached is not None and resp.status_code == 304:
+            return orjson.loads(cached[1])
+
+        # Cache the new body with its ETag
+        content = resp.content
+        if resp.status_code == 200 and "ETag" in resp.headers:
+            self.write_cache(cache_path, resp.headers["ETag"], content)
+
+        return orjson.loads(content)
+
+    async def get_json_async(
+        self,
+        session: aiohttp.ClientSession | httpx.AsyncClient | None,
+        url: str,
+        headers: dict = None,
+        params: dict = None,
+    ) -> json:
+        """
+        Async get_json() method to retrieve json data from the URL
+
+        Parameters
+        ----------
+        session : aiohttp.ClientSession | httpx.AsyncClient | None
+            Session to use for the request. None uses the HTTP/2 client.
+        url : str
+            Endpoint URL
+        headers : dict, optional
+            Headers to send with the request. Default is self.headers.
+        params : dict, optional
+            Parameters to send with the request
+
+        Returns
+        -------
+        json
+            Response data, parsed with orjson
+
+        Notes
+        -----
+        The cache is read and written in the event loop's default executor.
+        """
+
+        loop = asyncio.get_running_loop()
+
+        # Send the ETag of the cached response
+        cache_path = self.get_cache_path(url, params)
+        cached = await loop.run_in_executor(None, self.read_cache, cache_path)
+        headers = self.__conditional_headers(headers, cached)
+
+        resp = await self.get_async(session, url, headers=headers, params=params)
+
+        # aiohttp and httpx name the status differently
+        if isinstance(resp, httpx.Response):
+            status, content = resp.status_code, resp.content
+        else:
+            status, content = resp.status, await resp.read()
+
+        # Not modified: use the cached body
+        if cached is not None and status == 304:
+            return orjson.loads(cached[1])
+
+        # Cache the new body with its ETag
+        if status == 200 and "ETag" in resp.headers:
+            await loop.run_in_executor(
+                None, self.write_cache, cache_path, resp.headers["ETag"], content
+            )
+
+        return orjson.loads(content)
+
+    def get_cache_path(self, url: str, params: dict = None) -> Path:
+        """
+        Get the path of the cached response of the request
+
+        Parameters
+        ----------
+        url : str
+            Endpoint URL
+        params : dict, optional
+            Parameters sent with the request
+
+        Returns
+        -------
+        Path
+            Path to the zstd compressed response, named by the hash of the request
+        """
+
+        key = url if not params else f"{url}?{urlencode(sorted(params.items()))}"
+
+        return self.cache_dir.joinpath(hashlib.sha1(key.encode()).hexdigest() + ".zst")
+
+    @staticmethod
+    def read_cache(cache_path: Path) -> tuple[str, bytes] | None:
+        """
+        Read a response saved by write_cache()
+
+        Parameters
+        ----------
+        cache_path : Path
+            Path from get_cache_path()
+
+        Returns
+        -------
+        tuple[str, bytes] | None
+            ETag and body of the response. None if it is not cached.
+        """
+
+        # A removed or corrupted file is a cache miss
+        try:
+            data = zstandard.ZstdDecompressor().decompress(cache_path.read_bytes())
+        except (OSError, zstandard.ZstdError):
+            return None
+
+        # The ETag is the first line, the body follows
+        etag, _, content = data.partition(b"\n")
+
+        return etag.decode(), content
+
+    def write_cache(self, cache_path: Path, etag: str, content: bytes) -> None:
+        """
+        Save a response body with its ETag
+
+        Parameters
+        ----------
+        cache_path : Path
+            Path from get_cache_path()
+        etag : str
+            ETag header of the response
+        content : bytes
+            Body of the response
+
+        Notes
+        -----
+        The file is replaced atomically. Beyond 'cache_max_files' responses,
+        the least recently written ones are removed.
+        """
+
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+
+        # Write to a temporary file first so an interrupted run leaves no partial file
+        tmp_path = cache_path.with_suffix(f".{threading.get_ident()}.tmp")
+        tmp_path.write_bytes(
+            zstandard.ZstdCompressor(level=3).compress(etag.encode() + b"\n" + content)
+        )
+        os.replace(tmp_path, cache_path)
+
+        # Remove the oldest responses
+        with os.scandir(cache_path.parent) as entries:
+            files = [entry for entry in entries if entry.name.endswith(".zst")]
+        if len(files) <= self.cache_max_files:
+            return
+
+        # Another thread may remove a file meanwhile
+        written = []
+        for entry in files:
+            try:
+                written.append((entry.stat().st_mtime_ns, entry.path))
+            except FileNotFoundError:
+                continue
+        written.sort()
+        for _, path in written[: len(written) - self.cache_max_files]:
+            Path(path).unlink(missing_ok=True)
+
+    def __conditional_headers(
+        self, headers: dict | None, cached: tuple[str, bytes] | None
+    ) -> dict:
+        """
+        Add the If-None-Match header for a cached response
+
+        Parameters
+        ----------
+        headers : dict | None
+            Headers to send with the request. Default is self.headers.
+        cached : tuple[str, bytes] | None
+            Cached ETag and body from read_cache()
+
+        Returns
+        -------
+        dict
+            Headers to send with the request
+        """
+
+        if headers is None:
+            headers = self.headers
+
+        if cached is None:
+            return headers
+
+        return {**headers, "If-None-Match": cached[0]}
+
+    @property
+    def ratelimit_limit(self) -> int:
+        """GitHub API ratelimit, -1 before the first response"""
+        return GitHub.shared_ratelimit_limit
+
+    @property
+    def ratelimit_remaining(self) -> int:
+        """Remaining GitHub API requests, -1 before the first response"""
+        return GitHub.shared_ratelimit_remaining
+
+    def update_ratelimit(self, headers) -> None:
+        """
+        Update the ratelimit info from the response headers
+
+        Parameters
+        ----------
+        headers : Mapping[str, str]
+            Response headers
+
+        Notes
+        -----
+        The info is shared by all instances, e.g. all the commits of a download.
+        While 'ratelimit_low' or more requests remain, it is only updated
+        every 'ratelimit_update_interval' requests, on the first response and
+        when the ratelimit window resets.
+        """
+
+        remaining = headers.get("x-ratelimit-remaining")
+        if remaining is None:
+            return
+        remaining = int(remaining)
+        reset = float(headers.get("x-ratelimit-reset", GitHub.shared_ratelimit_reset))
+
+        # Skip the bookkeeping while plenty of requests are left in the same window
+        if (
+            GitHub.shared_ratelimit_limit >= 0
+            and self.ratelimit_low <= remaining <= GitHub.shared_ratelimit_remaining
+            and reset == GitHub.shared_ratelimit_reset
+            and remaining % self.ratelimit_update_interval
+        ):
+            return
+
+        GitHub.shared_ratelimit_remaining = remaining
+        GitHub.shared_ratelimit_reset = reset
+        if "x-ratelimit-limit" in headers:
+            GitHub.shared_ratelimit_limit = int(headers["x-ratelimit-limit"])
+
+    async def throttle_async(self) -> None:
+        """
+        Sleep to spread the remaining requests until the ratelimit resets
+
+        Notes
+        -----
+        Only sleeps when fewer than 'ratelimit_threshold' requests remain.
+        The shared counter needs no lock: it is only updated on the event loop.
+        """
+
+        remaining = GitHub.shared_ratelimit_remaining
+
+        # Plenty of requests left or unknown ratelimit
+        if not 0 <= remaining < self.ratelimit_threshold:
+            return
+
+        # Seconds until the ratelimit resets
+        delay = GitHub.shared_ratelimit_reset - time.time()
+
+        await asyncio.sleep(max(0.0, delay / max(1, remaining)))
+
+    @staticmethod
+    def dumps_json(data: json) -> str:
+        """
+        Serialize json data with orjson, for aiohttp request bodies
+
+        Parameters
+        ----------
+        data : json
+            Data to serialize
+
+        Returns
+        -------
+        str
+            Serialized data
+        """
+
+        return orjson.dumps(data).decode()
+
+    @staticmethod
+    def read_json(resp: requests.Response) -> json:
+        """
+        Read the json data of a get() response
+
+        Parameters
+        ----------
+        resp : requests.Response
+            Response from get()
+
+        Returns
+        -------
+        json
+            Response data, parsed with orjson
+        """
+
+        return orjson.loads(resp.content)
+
+    @staticmethod
+    async def read_json_async(resp: aiohttp.ClientResponse | httpx.Response) -> json:
+        """
+        Read the json data of a get_async() response
+
+        Parameters
+        ----------
+        resp : aiohttp.ClientResponse | httpx.Response
+            Response from get_async()
+
+        Returns
+        -------
+        json
+            Response data, parsed with orjson
+        """
+
+        # httpx reads the body when the request completes
+        if isinstance(resp, httpx.Response):
+            return orjson.loads(resp.content)
+
+        return orjson.loads(await resp.read())
@@ -1,8 +1,12 @@
 """ GitHub Repository Class File """
 
 import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterator
 
 import aiohttp
+import httpx
 import pandas as pd
 
 from .github import GitHub
@@ -11,6 +15,28 @@ from .github import GitHub
 class Repository(GitHub):
     """GitHub Repository"""
 
+    # Number of commits per page, the GitHub API max
+    commits_per_page: int = 100
+
+    # Columns of the commits dataframe, other fields are dropped
+    commit_columns: tuple[str, ...] = (
+        "sha",
+        "node_id",
+        "commit",
+        "url",
+        "html_url",
+        "comments_url",
+        "author",
+        "committer",
+        "parents",
+    )
+
+    # Text columns stored as arrow strings, the nested json columns stay objects
+    commit_dtypes: dict[str, str] = {
+        column: "string[pyarrow]"
+        for column in ("sha", "node_id", "url", "html_url", "comments_url")
+    }
+
     def __init__(self, owner: str, name: str):
         """
         Constructor
@@ -30,10 +56,6 @@ class Repository(GitHub):
         self.owner: str = owner
         self.name: str = name
 
-        # GitHub API Caches
-        self.ratelimit_limit: int = -1
-        self.ratelimit_remaining: int = -1
-
     @property
     def url(self) -> str:
         """Get the URL of the repository"""
@@ -44,12 +66,17 @@ class Repository(GitHub):
     def exists(self) -> bool:
         """Check if Repository exists"""
 
-        # Get the repository
-        resp = self.get(
+        # Get the repository status only, without its data
+        # Follow the redirect of a renamed or transferred repository
+        resp = self.requests_session.head(
             self.url,
             headers=self.headers,
+            allow_redirects=True,
         )
 
+        # Get the ratelimit info from the headers
+        self.update_ratelimit(resp.headers)
+
         # Repository exists
         if resp.status_code == 200:
             return True
@@ -57,6 +84,44 @@ class Repository(GitHub):
         # Repository does not exist
         return False
 
+    async def exists_async(
+        self, session: aiohttp.ClientSession | httpx.AsyncClient
+    ) -> bool:
+        """
+        Check if Repository exists asynchronously
+
+        Parameters
+        ----------
+        session : aiohttp.ClientSession | httpx.AsyncClient
+            Session to use for the request
+
+        Returns
+        -------
+        bool
+            True if the repository exists
+        """
+
+        # Get the repository status only, without its data
+        # Follow the redirect of a renamed or transferred repository
+        if isinstance(session, httpx.AsyncClient):
+            resp = await session.head(
+                self.url, headers=self.headers, follow_redirects=True
+            )
+        else:
+            resp = await session.head(
+                self.url, headers=self.headers, allow_redirects=True
+            )
+
+        # Get the ratelimit info from the headers
+        self.update_ratelimit(resp.headers)
+
+        # Repository exists
+        if isinstance(resp, httpx.Response):
+            return resp.status_code == 200
+
+        resp.release()
+        return resp.status == 200
+
     def get_commits(self, max_pages: int = 1) -> pd.DataFrame:
         """
         Get the commits of the repository
@@ -73,9 +138,9 @@ class Repository(GitHub):
 
         Notes
         -----
-        Does not end at first commit.
-        If max_pages > # of commits /100, API calls are wasted getting empty pages.
-        However, this will not break the program.
+        The first page is requested alone, then the next pages concurrently in
+        windows doubling up to connection_limit_per_host pages. Stops at the
+        first partial page, so at most one window is requested past the end.
         """
 
         # Base URL
@@ -87,12 +152,25 @@ class Repository(GitHub):
             name=self.name,
         )
 
-        # Get the first page
+        # Get the first page, the only one of small repositories
         commits = self.__get_commits(url, page=1)
-
-        # Get the other num_pages
-        for page in range(2, max_pages + 1):
-            commits.extend(self.__get_commits(url, page=page))
+        if max_pages <= 1 or self.__is_last_page(commits):
+            return self.__convert_commits_to_df(commits)
+
+        # Get the other pages concurrently over the session's connection pool
+        with ThreadPoolExecutor(
+            max_workers=min(max_pages - 1, self.connection_limit_per_host)
+        ) as executor:
+            for pages in self.__page_windows(max_pages):
+                # Unpack the pages of commits, in order
+                for page in executor.map(
+                    functools.partial(self.__get_commits, url), pages
+                ):
+                    commits.extend(page)
+
+                    # Stop at the last page of commits
+                    if self.__is_last_page(page):
+                        return self.__convert_commits_to_df(commits)
 
         # Convert to DataFrame
         # pylint: disable=invalid-name
@@ -112,7 +190,7 @@ class Repository(GitHub):
         max_pages : int
             Max number of num_pages to get. Default is 1
         session : aiohttp.ClientSession | None
-            Session to use. Default is None (new session)
+            Session to use. Default is None (new session for this call)
 
         Returns
         -------
@@ -121,12 +199,17 @@ class Repository(GitHub):
 
         Notes
         -----
-        Does not end at first commit.
-        If max_pages > # of commits /100, API calls are wasted getting empty pages.
-        However, this will not break the program.
+        The first page is requested alone, then the next pages concurrently in
+        windows doubling up to connection_limit_per_host pages. Stops at the
+        first partial page, so at most one window is requested past the end.
         """
 
-        __session_given: bool = session is not None
+        # Create a session for this call if one is not provided
+        if session is None:
+            async with self.create_session() as session:
+                return await self.get_commits_async(
+                    max_pages=max_pages, session=session
+                )
 
         # Base URL
         url = self.url + "/commits"
@@ -137,33 +220,33 @@ class Repository(GitHub):
             name=self.name,
         )
 
-        # TODO: Check problems with not using context manager
-        # Create a session if one is not provided
-        if session is None:
-            session = aiohttp.ClientSession()
-
-        # Create a set to store the tasks
-        tasks = set()
-
-        # Create tasks
-        for page in range(1, max_pages + 1):
-            task = self.__get_commits_async(session=session, url=url, page=page)
-
-            # Add the task to the set
-            tasks.add(task)
-
-        # Gather the tasks
-        commits = await asyncio.gather(*tasks, return_exceptions=False)
-
-        # Wait for the tasks to finish
-        await asyncio.sleep(0)
-
-        # Close the session if open
-        if not __session_given and session.closed is False:
-            await session.close()
-
-        # Unpack the nested list of commits
-        commits = [item for sublist in commits for item in sublist]
+        # Get the first page, the only one of small repositories
+        commits = await self.__get_commits_async(session=session, url=url, page=1)
+        if max_pages <= 1 or self.__is_last_page(commits):
+            return self.__convert_commits_to_df(commits)
+
+        # Get the other pages concurrently, a window of pages at a time
+        for pages in self.__page_windows(max_pages):
+            tasks = [
+                asyncio.create_task(
+                    self.__get_commits_async(session=session, url=url, page=page)
+                )
+                for page in pages
+            ]
+
+            try:
+                # Unpack the pages of commits, in order
+                for task in tasks:
+                    page = await task
+                    commits.extend(page)
+
+                    # Stop at the last page of commits
+                    if self.__is_last_page(page):
+                        return self.__convert_commits_to_df(commits)
+            finally:
+                # Cancel the pages not received yet
+                for task in tasks:
+                    task.cancel()
 
         # Convert to DataFrame
         # pylint: disable=invalid-name
@@ -192,11 +275,11 @@ class Repository(GitHub):
         # Build the params
         params = {
             "page": page,
-            "per_page": "100",
+            "per_page": str(self.commits_per_page),
         }
 
-        # Get the commits
-        commits = self.get(url, headers=self.headers, params=params).json()
+        # Get the commits, revalidating the page of the previous run
+        commits = self.get_json(url, headers=self.headers, params=params)
 
         # Return the commits
         return commits
@@ -217,21 +300,56 @@ class Repository(GitHub):
         # Build the params
         params = {
             "page": page,
-            "per_page": "100",
+            "per_page": str(self.commits_per_page),
         }
 
-        # Get the commits with get_async
-        resp = await self.get_async(
+        # Get the commits, revalidating the page of the previous run
+        commits = await self.get_json_async(
             url=url, headers=self.headers, params=params, session=session
         )
 
-        # Get the commits from the response
-        commits = await resp.json()
-
         return commits
 
-    @staticmethod
-    def __convert_commits_to_df(commits: list) -> pd.DataFrame:
+    def __page_windows(self, max_pages: int) -> Iterator[range]:
+        """
+        Split the pages after the first one into windows of concurrent requests
+
+        Parameters
+        ----------
+        max_pages : int
+            Max number of pages to get
+
+        Returns
+        -------
+        Iterator[range]
+            Windows of pages, doubling in size up to connection_limit_per_host
+        """
+
+        start, size = 2, 2
+        while start <= max_pages:
+            yield range(start, min(start + size, max_pages + 1))
+            start += size
+            size = min(2 * size, self.connection_limit_per_host)
+
+    def __is_last_page(self, page: list) -> bool:
+        """
+        Check if a page of commits is the last one
+
+        Parameters
+        ----------
+        page : list
+            Page of commits
+
+        Returns
+        -------
+        bool
+            True if the page is not full
+        """
+
+        return len(page) < self.commits_per_page
+
+    @classmethod
+    def __convert_commits_to_df(cls, commits: list) -> pd.DataFrame:
         """
         Convert the commits to a dataframe
 
@@ -246,9 +364,10 @@ class Repository(GitHub):
             Table of Commits
         """
 
-        # Convert to dataframe
+        # Convert to dataframe, keeping only the commit columns
         # pylint: disable=invalid-name
-        df = pd.DataFrame(commits)
+        df = pd.DataFrame.from_records(commits, columns=cls.commit_columns)
+        df = df.astype(cls.commit_dtypes, copy=False)
 
         # Rename index column 'index'
         df.index.name = "index"
@@ -1,40 +1,72 @@
 #!/usr/bin/env python
 """ GitHub Repository Commits Download Tool """
 
+import argparse
 import asyncio
 
 import aiohttp
 from tabulate import tabulate
 
-from git_analyzer.github import Download, Repository
+from git_analyzer.github import Download, GitHub, Repository
 
+# Use the faster libuv event loop where it is installed (not on Windows)
+try:
+    import uvloop
+except ImportError:
+    uvloop = None
 
-async def main():
-    """Main Function"""
 
-    print("GitHub Repository Commits Download Tool")
-    print("======================================")
-    print()
+def parse_args() -> argparse.Namespace:
+    """Parse the command line arguments, missing ones are asked for"""
+
+    parser = argparse.ArgumentParser(description="Download the commits of a repository")
+    parser.add_argument("--owner", help="Repository owner")
+    parser.add_argument("--name", help="Repository name")
+    parser.add_argument(
+        "-n", "--num-commits", type=int, help="Number of commits to download (0-4000)"
+    )
 
-    # Get the repository owner and name
-    repo_valid = False
-    while not repo_valid:
-        print("Enter the GitHub repository information:")
-        owner: str = input("Repository Owner : ")
-        name: str = input("Repository Name  : ")
+    args = parser.parse_args()
+
+    # Reject it instead of asking for another number in a non-interactive run
+    if args.num_commits is not None and args.num_commits < 0:
+        parser.error("the number of commits must be positive")
+
+    return args
+
+
+async def get_repository(
+    session: aiohttp.ClientSession, owner: str | None, name: str | None
+) -> Repository:
+    """Get an existing repository, asking for the owner and name not given"""
+
+    while True:
+        # Ask for the repository information not given as arguments
+        if owner is None or name is None:
+            print("Enter the GitHub repository information:")
+        if owner is None:
+            owner = input("Repository Owner : ")
+        if name is None:
+            name = input("Repository Name  : ")
 
         # Check if the repository exists
         repository = Repository(owner=owner, name=name)
-        if repository.exists:
-            repo_valid = True
-        else:
-            print("\nREPOSITORY DOES NOT EXIST")
-            print("--------------------------")
-            print()
+        if await repository.exists_async(session):
+            return repository
+
+        print("\nREPOSITORY DOES NOT EXIST")
+        print("--------------------------")
+        print()
+        owner = name = None
+
+
+def get_num_commits(num_commits: int | None) -> int:
+    """Get the number of commits to download, asking for it if not given"""
 
-    # Get the number of commits to download
     # pylint: disable=invalid-name
-    num_commits: int = -1
+    if num_commits is None:
+        num_commits = -1
+
     while num_commits < 0:
         # Get the number of commits
         try:
@@ -51,32 +83,47 @@ async def main():
             print("----------------------------------")
             print()
 
-        if num_commits > 4000:
-            num_commits = 4000
-            print("Limit is 4000 commits")
-            print("---------------------")
-            print()
+    if num_commits > 4000:
+        num_commits = 4000
+        print("Limit is 4000 commits")
+        print("---------------------")
+        print()
+
+    return num_commits
 
-    # Create the downloader
-    # noinspection PyUnboundLocalVariable
-    downloader = Download(
-        owner=owner,
-        name=name,
-        number_of_commits=num_commits,
-    )
 
-    # Print download directory
-    print("\nDownload Directory")
-    print("------------------")
-    print(downloader.directory)
+async def main(args: argparse.Namespace):
+    """Main Function"""
 
-    # Create downloading animation
-    downloading_str = f"\nDownloading the latest {num_commits} Commits..."
-    print(downloading_str)
-    print("-" * (len(downloading_str) - 1))
+    print("GitHub Repository Commits Download Tool")
+    print("======================================")
+    print()
 
-    # Download the commits asynchronously
-    async with aiohttp.ClientSession() as session:
+    # Share one session across the repository check and the download
+    async with GitHub().create_session() as session:
+        # Get the repository and the number of commits to download
+        repository = await get_repository(session, args.owner, args.name)
+        num_commits = get_num_commits(args.num_commits)
+
+        # Create the downloader, the repository is already checked
+        downloader = Download(
+            owner=repository.owner,
+            name=repository.name,
+            number_of_commits=num_commits,
+            check_exists=False,
+        )
+
+        # Print download directory
+        print("\nDownload Directory")
+        print("------------------")
+        print(downloader.directory)
+
+        # Create downloading animation
+        downloading_str = f"\nDownloading the latest {num_commits} Commits..."
+        print(downloading_str)
+        print("-" * (len(downloading_str) - 1))
+
+        # Download the commits asynchronously
         await downloader.download_commits_async(session=session, overwrite=False)
 
     # Print Finished
@@ -85,10 +132,12 @@ async def main():
     # Print the folder index
     print("Downloaded Commits Index")
     print("------------------------")
-    index_df_sorted = downloader.get_index().sort_values(by="sha", ascending=True)
+    index_df_sorted = downloader.get_index(sort_by="sha")
     print(tabulate(index_df_sorted, headers="keys", tablefmt="psql"))
 
 
 # Run the downloader
 if __name__ == "__main__":
-    asyncio.run(main())
+    if uvloop is not None:
+        uvloop.install()
+    asyncio.run(main(parse_args()))
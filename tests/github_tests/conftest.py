@@ -0,0 +1,14 @@
+""" Shared fixtures of the github tests """
+
+import pytest
+
+from git_analyzer.github import GitHub
+
+
+@pytest.fixture(scope="session", autouse=True)
+def cache_dir(tmp_path_factory):
+    """Keep the ETag cache of the tests out of the user's cache directory"""
+
+    GitHub.cache_dir = tmp_path_factory.mktemp("cache")
+
+    return GitHub.cache_dir
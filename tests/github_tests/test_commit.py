@@ -2,6 +2,7 @@
 
 import aiohttp
 import pandas as pd
+import pyarrow as pa
 import pytest
 
 from git_analyzer.github import Commit
@@ -15,26 +16,26 @@ class TestCommit:
         "70664fc10c0d722ec79d746d8ac1db8546c94114"
     )
 
-    commit = Commit(url=url)
+    @pytest.fixture(scope="class")
+    def commit(self) -> Commit:
+        """Commit with its data, retrieved once for the tests of the class"""
+        return Commit(url=self.url, auto_get=True)
 
-    def test_init(self):
+    def test_init(self, commit):
         """Test Initialization"""
 
-        commit = Commit(url=self.url, auto_get=False)
-        assert commit is not None
-        assert commit.url == self.url
-        assert getattr(commit, "data", None) is None
+        new_commit = Commit(url=self.url, auto_get=False)
+        assert new_commit is not None
+        assert new_commit.url == self.url
+        assert getattr(new_commit, "data", None) is None
 
         # Check auto_get is working
-        commit = self.commit
         assert commit.url == self.url
         assert isinstance(commit.data, dict)
 
-    def test_get(self):
+    def test_get(self, commit):
         """Test get()"""
 
-        commit = self.commit
-
         # Delete the data attribute
         commit.data = None
 
@@ -45,11 +46,9 @@ class TestCommit:
         assert commit_data is not None
         assert isinstance(commit_data, dict)
 
-    def test_properties(self):
+    def test_properties(self, commit):
         """Test Properties"""
 
-        commit = self.commit
-
         # Verify the repository repo
         assert commit.repository == "linux"
 
@@ -85,11 +84,9 @@ class TestCommit:
         assert isinstance(commit.files, list)
         assert len(commit.files) == 8
 
-    def test_parse(self):
+    def test_parse(self, commit):
         """Test parse()"""
 
-        commit = self.commit
-
         # Parse the commit
         changes = commit.parse()
 
@@ -109,10 +106,44 @@ class TestCommit:
             "patch",
         ]
 
-    def test_get_file_path(self):
-        """Test get_file_path()"""
+    def test_count_patch_lines(self, commit):
+        """Test count_patch_lines()"""
 
-        commit = self.commit
+        # Parse the commit
+        if commit.table is None:
+            commit.parse()
+
+        # Count the lines of the patches
+        counts = commit.count_patch_lines(commit.table["patch"])
+
+        # Verify the counts match the file statistics
+        assert counts.num_rows == 8
+        added_lines = counts["added_lines"].to_pylist()
+        removed_lines = counts["removed_lines"].to_pylist()
+        assert added_lines == commit.table["additions"].to_pylist()
+        assert removed_lines == commit.table["deletions"].to_pylist()
+        assert all(hunks > 0 for hunks in counts["hunks"].to_pylist())
+
+    def test_count_patch_lines_offline(self):
+        """Test count_patch_lines() on a hand-written patch"""
+
+        patch = pa.array(
+            [
+                "@@ -1,2 +1,2 @@\n-old\n+new\n context\n@@ -9 +9,2 @@\n+a\n+b",
+                None,
+            ]
+        )
+
+        # Count the lines of the patches
+        counts = Commit.count_patch_lines(patch)
+
+        # Verify the counts, a file without a patch has none
+        assert counts["hunks"].to_pylist() == [2, 0]
+        assert counts["added_lines"].to_pylist() == [3, 0]
+        assert counts["removed_lines"].to_pylist() == [1, 0]
+
+    def test_get_file_path(self, commit):
+        """Test get_file_path()"""
 
         # Get the commit data
         if commit.data is None:
@@ -127,10 +158,38 @@ class TestCommit:
         assert file_path.parent.name == "linux"
         assert file_path.suffix == ".parquet"
 
-    def test_save(self):
-        """Test save()"""
+    def test_raw_cache(self, commit):
+        """Test read_raw() and write_raw()"""
+
+        # Get the commit data if it doesn't exist
+        if commit.data is None:
+            commit.get_commit()
+
+        # Save the raw data
+        commit.write_raw(commit.data)
+
+        # Verify the raw data is read back
+        assert commit.get_raw_path().exists()
+        assert commit.read_raw() == commit.data
+
+    def test_raw_cache_corrupted(self, tmp_path):
+        """Test read_raw() with a truncated file"""
+
+        sha = self.url.rsplit("/", 1)[-1]
+        commit = Commit(url=self.url, sha=sha, directory=tmp_path)
 
-        commit = self.commit
+        # Save the raw data, then truncate it
+        commit.write_raw({"sha": sha})
+        raw_path = commit.get_raw_path()
+        assert commit.read_raw() == {"sha": sha}
+        raw_path.write_bytes(raw_path.read_bytes()[:-4])
+
+        # Verify the truncated file is a cache miss
+        assert commit.read_raw() is None
+        assert not raw_path.with_suffix(".zst.tmp").exists()
+
+    def test_save(self, commit):
+        """Test save()"""
 
         # Get the commit data if it doesn't exist
         if commit.data is None:
@@ -152,11 +211,9 @@ class TestCommit:
         assert file_path.exists()
 
     @pytest.mark.asyncio
-    async def test_get_async(self):
+    async def test_get_async(self, commit):
         """Test get_async()"""
 
-        commit = self.commit
-
         # Delete the data attribute
         commit.data = None
 
@@ -169,11 +226,9 @@ class TestCommit:
         assert isinstance(commit_data, dict)
 
     @pytest.mark.asyncio
-    async def test_parse_async(self):
+    async def test_parse_async(self, commit):
         """Test parse_async()"""
 
-        commit = self.commit
-
         # Parse the commit
         async with aiohttp.ClientSession() as session:
             changes = await commit.parse_async(session)
@@ -195,11 +250,9 @@ class TestCommit:
         ]
 
     @pytest.mark.asyncio
-    async def test_save_async(self):
+    async def test_save_async(self, commit):
         """Test save_async()"""
 
-        commit = self.commit
-
         # Create an aiohttp session
         async with aiohttp.ClientSession() as session:
             # Get the commit data if it doesn't exist
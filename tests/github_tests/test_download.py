@@ -3,9 +3,11 @@
 from pathlib import Path
 
 import aiohttp
+import pandas as pd
+import pyarrow.parquet as pq
 import pytest
 
-from git_analyzer.github import Download
+from git_analyzer.github import Commit, Download, Repository
 
 
 @pytest.mark.downloads
@@ -32,17 +34,7 @@ class TestDownload:
         download.get_commits_df()
         assert download.commits_df is not None
         assert download.commits_df.shape[0] == self.num_commits
-        assert download.commits_df.columns.tolist() == [
-            "sha",
-            "node_id",
-            "commit",
-            "url",
-            "html_url",
-            "comments_url",
-            "author",
-            "committer",
-            "parents",
-        ]
+        assert download.commits_df.columns.tolist() == list(Repository.commit_columns)
 
     @pytest.mark.asyncio
     async def test_get_commits_session(self):
@@ -55,17 +47,7 @@ class TestDownload:
 
         assert download.commits_df is not None
         assert download.commits_df.shape[0] == self.num_commits
-        assert download.commits_df.columns.tolist() == [
-            "sha",
-            "node_id",
-            "commit",
-            "url",
-            "html_url",
-            "comments_url",
-            "author",
-            "committer",
-            "parents",
-        ]
+        assert download.commits_df.columns.tolist() == list(Repository.commit_columns)
 
     @pytest.mark.slow
     def test_download_commits(self):
@@ -98,6 +80,77 @@ class TestDownload:
             file_path = download.directory.joinpath(sha + ".parquet")
             assert Path(file_path).exists()
 
+    def test_get_saved_shas(self):
+        """Test get_saved_shas()"""
+
+        download = self.download
+
+        # Verify the shas match the saved files
+        saved_files = Path(download.directory).glob("*.parquet")
+        assert download.get_saved_shas() == {path.stem for path in saved_files}
+
+    def test_read_commits(self):
+        """Test read_commits()"""
+
+        download = self.download
+
+        # Read the commits saved by the download tests
+        shas = download.commits_df["sha"].tolist()[:10]
+        changes = download.read_commits(shas)
+
+        # Verify the files of every commit are read
+        assert changes.columns[0] == "commit_sha"
+        assert "filename" in changes.columns
+        assert set(changes["commit_sha"]) <= set(shas)
+
+    def test_get_stats(self):
+        """Test get_stats()"""
+
+        download = self.download
+
+        # Get the statistics of the commits saved by the download tests
+        shas = download.commits_df["sha"].tolist()[:10]
+        stats = download.get_stats(shas)
+
+        # Verify the statistics of every commit
+        assert stats.columns.tolist() == [
+            "files",
+            "additions",
+            "deletions",
+            "changes",
+            "hunks",
+        ]
+        assert set(stats.index) <= set(shas)
+        assert (stats["changes"] == stats["additions"] + stats["deletions"]).all()
+
+    def test_get_parent_edges(self):
+        """Test get_parent_edges()"""
+
+        download = self.download
+        index = download.get_index()
+        child_idx, parent_idx = download.get_parent_edges()
+
+        # Verify every edge points to a parent of the child
+        assert len(child_idx) == len(parent_idx) > 0
+        for child, parent in zip(child_idx[:10], parent_idx[:10]):
+            assert index["sha"].iloc[parent] in index["parents"].iloc[child]
+
+    @pytest.mark.asyncio
+    async def test_download_commits_combined_async(self):
+        """Test download_commits_combined_async()"""
+
+        download = self.download
+        async with aiohttp.ClientSession() as session:
+            file_path = await download.download_commits_combined_async(
+                session=session, overwrite=True
+            )
+
+        # Verify every commit is in the combined file
+        assert file_path.exists()
+        table = pq.read_table(file_path, columns=["commit_sha"])
+        assert set(table["commit_sha"].to_pylist()) <= set(download.commits_df["sha"])
+        assert table.num_rows > 0
+
     def test_get_index(self):
         """Test get_index()"""
 
@@ -113,3 +166,68 @@ class TestDownload:
         # Verify index is up-to-date
         num_files = len(list(Path(download.directory).glob("*.parquet")))
         assert index.shape[0] == num_files
+
+        # Verify the sorted index
+        sorted_index = download.get_index(sort_by="sha")
+        assert sorted_index["sha"].tolist() == sorted(index["sha"].tolist())
+
+
+@pytest.mark.asyncio
+async def test_commit_urls(monkeypatch, tmp_path):
+    """Test the commit urls built from get_commits_df_async() without the network"""
+
+    # Page of commits returned by the API
+    page = [
+        {column: f"{column}-{index}" for column in Repository.commit_columns}
+        | {"sha": f"{index:040x}"}
+        for index in range(3)
+    ]
+
+    async def get_json_async(*_args, **_kwargs):
+        return page
+
+    # Record the urls of the commits instead of getting them
+    urls = []
+
+    async def get_commit_async(self, session, cache=True):
+        # pylint: disable=unused-argument
+        urls.append(self.url)
+        self.data = {"sha": self.sha, "files": []}
+        return self.data
+
+    monkeypatch.setattr(Repository, "get_json_async", get_json_async)
+    monkeypatch.setattr(Commit, "get_commit_async", get_commit_async)
+    monkeypatch.setattr(Download, "data_dir", tmp_path)
+
+    download = Download("torvalds", "linux", 3, check_exists=False)
+    await download.download_commits_async()
+
+    # Verify the urls of the string[pyarrow] shas
+    assert download.commits_df["sha"].dtype == "string"
+    assert urls == [
+        f"https://api.github.com/repos/torvalds/linux/commits/{commit['sha']}"
+        for commit in page
+    ]
+
+
+@pytest.mark.asyncio
+async def test_download_commits_combined_errors(monkeypatch, tmp_path):
+    """Test a failed commit does not stop download_commits_combined_async()"""
+
+    async def get_commit_async(self, session, cache=True):
+        # pylint: disable=unused-argument
+        if self.sha == "bad":
+            raise RuntimeError("Commit not found")
+        self.data = {"sha": self.sha, "files": [{"filename": f"{self.sha}.c"}]}
+        return self.data
+
+    monkeypatch.setattr(Commit, "get_commit_async", get_commit_async)
+    monkeypatch.setattr(Download, "data_dir", tmp_path)
+
+    download = Download("torvalds", "linux", 3, check_exists=False)
+    download.commits_df = pd.DataFrame({"sha": ["good", "bad", "other"]})
+    path = await download.download_commits_combined_async()
+
+    # Verify the fetched commits are written without the failed one
+    table = pq.read_table(path)
+    assert table["commit_sha"].to_pylist() == ["good", "other"]
@@ -1,6 +1,9 @@
 """ Test github.github.py """
 
+import os
+
 import aiohttp
+import httpx
 import pytest
 
 from git_analyzer.github import GitHub
@@ -18,8 +21,8 @@ class TestGitHub:
         assert github is not None
         assert github.token is not None
         assert github.headers is not None
-        assert github.ratelimit_remaining == -1
-        assert github.ratelimit_limit == -1
+        assert github.ratelimit_remaining == GitHub.shared_ratelimit_remaining
+        assert github.ratelimit_limit == GitHub.shared_ratelimit_limit
 
     def test_build_headers(self):
         """Test build_headers"""
@@ -33,7 +36,11 @@ class TestGitHub:
         """Test get"""
 
         github = GitHub()
+        session = github.requests_session
         assert github.get(self.linux_url) is not None
+
+        # Verify the session is reused
+        assert github.requests_session is session
         assert github.ratelimit_remaining < github.ratelimit_limit
         assert github.ratelimit_remaining > 0
         assert github.ratelimit_limit == 5000
@@ -52,3 +59,156 @@ class TestGitHub:
         assert github.ratelimit_remaining < github.ratelimit_limit
         assert github.ratelimit_remaining > 0
         assert github.ratelimit_limit == 5000
+
+    @pytest.mark.asyncio
+    async def test_get_async_http2(self):
+        """Test get_async without a session"""
+
+        github = GitHub()
+
+        # Uses the HTTP/2 client opened by 'async with'
+        async with github:
+            client = github.http2_client
+            resp = await github.get_async(None, self.linux_url)
+            assert resp.http_version == "HTTP/2"
+            assert await github.read_json_async(resp) is not None
+            assert github.http2_client is client
+
+        # Verify the client is closed
+        assert client.is_closed
+        assert github.http2_client is None
+
+    @pytest.mark.asyncio
+    async def test_get_async_client_closed(self, monkeypatch):
+        """Test get_async without a session closes the clients it uses"""
+
+        github = GitHub()
+
+        # Record the clients answering without the network
+        clients = []
+
+        def create_http2_client():
+            client = httpx.AsyncClient(
+                transport=httpx.MockTransport(lambda request: httpx.Response(200))
+            )
+            clients.append(client)
+            return client
+
+        monkeypatch.setattr(github, "create_http2_client", create_http2_client)
+
+        # A client for the request only outside of 'async with'
+        await github.get_async(None, self.linux_url)
+        assert github.http2_client is None
+
+        # One client for all the requests inside of 'async with'
+        async with github:
+            await github.get_async(None, self.linux_url)
+            await github.get_async(None, self.linux_url)
+
+        # Verify all the clients are closed
+        assert len(clients) == 2
+        assert all(client.is_closed for client in clients)
+
+    def test_get_json(self, tmp_path):
+        """Test get_json"""
+
+        github = GitHub()
+        github.cache_dir = tmp_path
+
+        # First request caches the response with its ETag
+        data = github.get_json(self.linux_url)
+        assert data["full_name"] == "torvalds/linux"
+        etag, _ = github.read_cache(github.get_cache_path(self.linux_url))
+        assert etag
+
+        # Second request is revalidated
+        assert github.get_json(self.linux_url) == data
+        assert github.response.status_code in (200, 304)
+
+    def test_cache(self, tmp_path):
+        """Test write_cache and read_cache"""
+
+        github = GitHub()
+        github.cache_dir = tmp_path
+        github.cache_max_files = 2
+
+        # Write three responses, only the two latest are kept
+        paths = [
+            github.get_cache_path(self.linux_url, {"page": page}) for page in "123"
+        ]
+        for page, path in enumerate(paths):
+            github.write_cache(path, f'"etag-{page}"', b"[]")
+            os.utime(path, ns=(page, page))
+
+        assert github.read_cache(paths[0]) is None
+        assert github.read_cache(paths[2]) == ('"etag-2"', b"[]")
+        assert sorted(tmp_path.iterdir()) == sorted(paths[1:])
+
+        # A truncated response is a cache miss
+        paths[2].write_bytes(paths[2].read_bytes()[:-4])
+        assert github.read_cache(paths[2]) is None
+
+    def test_update_ratelimit(self, monkeypatch):
+        """Test update_ratelimit"""
+
+        # Start without ratelimit info
+        monkeypatch.setattr(GitHub, "shared_ratelimit_limit", -1)
+        monkeypatch.setattr(GitHub, "shared_ratelimit_remaining", -1)
+        monkeypatch.setattr(GitHub, "shared_ratelimit_reset", 0.0)
+
+        github = GitHub()
+        headers = {
+            "x-ratelimit-limit": "5000",
+            "x-ratelimit-remaining": "4999",
+            "x-ratelimit-reset": "0",
+        }
+
+        # The first response is always recorded
+        github.update_ratelimit(headers)
+        assert github.ratelimit_limit == 5000
+        assert github.ratelimit_remaining == 4999
+
+        # Skipped while many requests remain, except every interval
+        github.update_ratelimit({**headers, "x-ratelimit-remaining": "4998"})
+        assert github.ratelimit_remaining == 4999
+        github.update_ratelimit({**headers, "x-ratelimit-remaining": "4900"})
+        assert github.ratelimit_remaining == 4900
+
+        # Always recorded when few requests remain
+        github.update_ratelimit({**headers, "x-ratelimit-remaining": "199"})
+        assert github.ratelimit_remaining == 199
+
+        # Verify the info is shared with the other instances
+        assert GitHub().ratelimit_remaining == 199
+
+    def test_update_ratelimit_reset(self, monkeypatch):
+        """Test update_ratelimit when the ratelimit window resets"""
+
+        # Start near the end of a window
+        monkeypatch.setattr(GitHub, "shared_ratelimit_limit", 5000)
+        monkeypatch.setattr(GitHub, "shared_ratelimit_remaining", 250)
+        monkeypatch.setattr(GitHub, "shared_ratelimit_reset", 1000.0)
+
+        github = GitHub()
+        headers = {
+            "x-ratelimit-limit": "5000",
+            "x-ratelimit-remaining": "4999",
+            "x-ratelimit-reset": "1000",
+        }
+
+        # Recorded when the remaining requests go up
+        github.update_ratelimit(headers)
+        assert github.ratelimit_remaining == 4999
+
+        # Recorded when the reset time changes
+        github.update_ratelimit(
+            {**headers, "x-ratelimit-remaining": "4998", "x-ratelimit-reset": "4600"}
+        )
+        assert github.ratelimit_remaining == 4998
+        assert GitHub.shared_ratelimit_reset == 4600.0
+
+        # Skipped again within the new window
+        github.update_ratelimit(
+            {**headers, "x-ratelimit-remaining": "4997", "x-ratelimit-reset": "4600"}
+        )
+        assert github.ratelimit_remaining == 4998
@@ -34,6 +34,27 @@ class TestRepository:
         assert repo.ratelimit_remaining < repo.ratelimit_limit
         assert repo.ratelimit_remaining > 0
 
+    def test_exists_renamed(self):
+        """Test if a renamed repository exists"""
+
+        # pydata/pandas redirects to pandas-dev/pandas
+        assert Repository("pydata", "pandas").exists is True
+
+    @pytest.mark.asyncio
+    async def test_exists_async(self):
+        """Test if repository exists asynchronously"""
+
+        async with aiohttp.ClientSession() as session:
+            assert await self.repo.exists_async(session) is True
+
+            # Check a repository that does not exist
+            missing = Repository("torvalds", "not-a-linux-repository")
+            assert await missing.exists_async(session) is False
+
+            # Check a renamed repository
+            renamed = Repository("pydata", "pandas")
+            assert await renamed.exists_async(session) is True
+
     def test_token_valid(self):
         """Test if token is valid and working"""
 
@@ -87,6 +108,33 @@ class TestRepository:
         assert commits is not None
         assert commits.shape[0] == 1000
 
+    @pytest.mark.asyncio
+    async def test_get_commits_async_last_page(self, monkeypatch):
+        """Test get_commits_async stops requesting pages after the last one"""
+
+        repo = Repository("torvalds", "linux")
+
+        # 1050 commits: the 11th page is the last one, with 50 commits
+        requested = []
+
+        async def get_json_async(*_args, params, **_kwargs):
+            page = params["page"]
+            requested.append(page)
+            num_commits = min(max(1050 - (page - 1) * 100, 0), 100)
+            return [
+                {"sha": f"{page}-{index}", "parents": []}
+                for index in range(num_commits)
+            ]
+
+        monkeypatch.setattr(repo, "get_json_async", get_json_async)
+
+        # Get the commits
+        commits = await repo.get_commits_async(max_pages=100, session=object())
+        assert commits.shape[0] == 1050
+
+        # Verify only the window of the last page is requested past it
+        assert sorted(requested) == list(range(1, 16))
+
     @pytest.mark.asyncio
     async def test_get_commits_async_session(self):
         """Test get_commits_async with session input"""